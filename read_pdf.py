@@ -3,15 +3,211 @@ import json
 import re
 from pathlib import Path
 import fitz  # PyMuPDF
-from collections import defaultdict, Counter
+import numpy as np
+from collections import Counter
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 import logging
 import sys
 
+# orjson serializes at C speed; fall back to the stdlib json when absent
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # --- Configuration ---
 # Setup logging to display informational messages.
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Text extraction flags: the default dict flags, minus image preservation.
+# Image buffers are never used here, so skipping them avoids allocating
+# their (potentially large) block structures.
+TEXT_EXTRACTION_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# Documents shorter than this are extracted with threads instead of
+# processes, since process startup would outweigh the parallel gain.
+MIN_PAGES_FOR_PROCESS_POOL = 8
+
+
+def _numbered_prefix_depth(text):
+    """
+    Counts the parts of a numbered heading prefix like "2.3.1 Overview".
+
+    Equivalent to matching ^(\\d+(\\.\\d+)*) and counting its dot-separated
+    parts, but as a direct character scan with no regex or split allocation.
+
+    Args:
+        text (str): The line's text.
+
+    Returns:
+        tuple: (depth, end) where depth is the number of numeric parts (e.g. 3
+               for "2.3.1", 0 if the text does not start with a number) and
+               end is the index just past the prefix.
+    """
+    i = 0
+    n = len(text)
+    while i < n and text[i].isdigit():
+        i += 1
+    if i == 0:
+        return 0, 0
+    depth = 1
+    while i + 1 < n and text[i] == '.' and text[i + 1].isdigit():
+        i += 1
+        depth += 1
+        while i < n and text[i].isdigit():
+            i += 1
+    return depth, i
+
+
+class TextLines:
+    """
+    Columnar (struct-of-arrays) storage for the extracted text lines.
+
+    The numeric fields (sizes, flags, pages, num_depths) live in parallel
+    NumPy arrays so the downstream passes can filter with vectorized masks
+    instead of touching a Python dict per line; the string fields stay in
+    plain lists.
+    """
+    __slots__ = ('texts', 'fonts', 'sizes', 'flags', 'bboxes', 'pages',
+                 'num_depths', 'lengths')
+
+    def __init__(self, texts, fonts, sizes, flags, bboxes, pages, num_depths):
+        self.texts = texts
+        self.fonts = fonts
+        self.sizes = sizes
+        self.flags = flags
+        self.bboxes = bboxes
+        self.pages = pages
+        self.num_depths = num_depths
+        # Derived column: text lengths, so length gates can run as one
+        # vectorized mask instead of a len() call per line in the hot loop
+        self.lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+
+    def __len__(self):
+        return len(self.texts)
+
+    @classmethod
+    def from_tuples(cls, records):
+        """
+        Builds columnar storage from a list of per-line tuples.
+
+        Args:
+            records (list): (text, font, size, flags, bbox, page, num_depth) tuples.
+
+        Returns:
+            TextLines: The columnar view of the same lines.
+        """
+        if not records:
+            return cls([], [], np.empty(0, dtype=np.float64),
+                       np.empty(0, dtype=np.int64), [],
+                       np.empty(0, dtype=np.int64),
+                       np.empty(0, dtype=np.int64))
+        texts, fonts, sizes, flags, bboxes, pages, num_depths = map(list, zip(*records))
+        return cls(
+            texts=texts,
+            fonts=fonts,
+            sizes=np.asarray(sizes, dtype=np.float64),
+            flags=np.asarray(flags, dtype=np.int64),
+            bboxes=bboxes,
+            pages=np.asarray(pages, dtype=np.int64),
+            num_depths=np.asarray(num_depths, dtype=np.int64),
+        )
+
+
+def _extract_page_lines(pdf_path, page_indices, header_margin, footer_margin):
+    """
+    Worker function: extracts raw line records for a contiguous range of pages.
+
+    Runs in a separate process (or thread, for small documents), so it opens
+    its own document handle and must stay picklable at module level.
+
+    Args:
+        pdf_path (str): The file path to the PDF.
+        page_indices (range): The zero-based page indices this worker handles.
+        header_margin (float): Y-coordinate below which a line counts as a header candidate.
+        footer_margin (float): Y-coordinate above which a line counts as a footer candidate.
+
+    Returns:
+        tuple: (raw_lines, header_candidates, footer_candidates) where raw_lines
+               is a list of (text, font, size, flags, bbox, page, num_depth)
+               tuples and the candidates are Counters of texts seen in the
+               top/bottom margins.
+    """
+    header_candidates = Counter()
+    footer_candidates = Counter()
+    raw_lines = []
+
+    doc = fitz.open(pdf_path)
+    try:
+        for page_num in page_indices:
+            page = doc[page_num]
+            # Build the TextPage once and extract from it directly;
+            # page.get_text would create (and discard) an equivalent
+            # TextPage internally on every call.
+            tp = page.get_textpage(flags=TEXT_EXTRACTION_FLAGS)
+            blocks = tp.extractDICT().get("blocks", [])
+            page_lines = []
+            for block in blocks:
+                # Only descend into text blocks (type 0); image blocks carry no lines
+                if block.get("type", 0) == 0:
+                    # A block confined to the middle band cannot contain
+                    # header/footer candidates, so its lines skip the
+                    # per-line margin checks entirely.
+                    block_bbox = block.get("bbox", (0, 0, 0, 0))
+                    in_margin_band = (block_bbox[1] < header_margin
+                                      or block_bbox[3] > footer_margin)
+                    for line in block.get("lines", []):
+                        if not line.get("spans"):
+                            continue
+
+                        # Strip each span once and join from a list so str.join
+                        # can size its output buffer in a single allocation;
+                        # the parts are already stripped, so no outer strip.
+                        parts = [t for t in (span["text"].strip() for span in line["spans"]) if t]
+                        if not parts:
+                            continue
+                        line_text = " ".join(parts)
+
+                        # Track header/footer candidates by vertical position
+                        if in_margin_band and len(line_text) >= 4:
+                            y1 = line["bbox"][1]
+                            if y1 < header_margin:
+                                header_candidates[line_text] += 1
+                            elif y1 > footer_margin:
+                                footer_candidates[line_text] += 1
+
+                        # Tuples are cheaper to allocate than dicts; the fields
+                        # are unpacked into columnar arrays at the end. The
+                        # numbered-prefix depth is parsed once here so the
+                        # heading passes rarely re-scan the text for it. Only a
+                        # whitespace-delimited prefix ("1.2 Foo", not "1.2Foo"
+                        # or "1. Foo") counts, matching the numbered heading
+                        # pattern in PDFOutlineExtractor.heading_patterns.
+                        depth, prefix_end = _numbered_prefix_depth(line_text)
+                        if depth and not (prefix_end < len(line_text)
+                                          and line_text[prefix_end].isspace()):
+                            depth = 0
+                        first_span = line["spans"][0]
+                        page_lines.append((
+                            line_text,
+                            first_span["font"],
+                            round(first_span["size"], 1),
+                            first_span["flags"],
+                            line["bbox"],
+                            page_num + 1,
+                            depth,
+                        ))
+            raw_lines.extend(page_lines)
+            # Drop the reference so the TextPage is freed before the next page
+            tp = None
+    finally:
+        doc.close()
+
+    return raw_lines, header_candidates, footer_candidates
+
 class PDFOutlineExtractor:
     """
     Extracts a structured outline from a PDF file by analyzing font styles and text patterns.
@@ -32,53 +228,46 @@ class PDFOutlineExtractor:
             # Matches Roman numeral headings like "I. Text"
             r'^[IVXLCDM]+\.\s+.+',
         ]
+        # Compile the patterns once into a single alternation; matching happens
+        # on every extracted line, and one combined match call replaces a
+        # Python-level loop over five separate patterns. Alternatives are
+        # tried left to right, matching the old loop's order.
+        self._combined_heading_re = re.compile('|'.join(f'(?:{p})' for p in self.heading_patterns))
+        # Matches TOC entries with dot leaders like "Introduction ....... 4"
+        self._toc_dots_re = re.compile(r'\s\.{3,}\s*\d+$')
+        # Matches lines that are nothing but a number (e.g. stray page numbers)
+        self._numeric_only_re = re.compile(r'^\d+$')
         # Add keywords that are almost always headings
         self.explicit_headings = {
             "acknowledgements", "revision history", "table of contents", 
             "references", "trademarks", "introduction", "overview"
         }
-
-    def _identify_headers_and_footers(self, doc):
+        # Length bounds of the explicit keywords: lets the keyword check bail
+        # out without allocating a lowercase copy for most lines.
+        self._explicit_len_range = (
+            min(map(len, self.explicit_headings)),
+            max(map(len, self.explicit_headings)),
+        )
+        # Memoize the heading predicate: repeated texts (running captions,
+        # recurring section headers) otherwise re-run the whole regex cascade.
+        self._is_heading_cached = functools.lru_cache(maxsize=4096)(self._heading_predicate)
+
+    def _compute_common_texts(self, header_candidates, footer_candidates, page_count):
         """
-        Scans the top and bottom margins of each page to identify common, repeating text
-        that is likely a header or footer by checking its vertical position.
+        Decides which candidate header/footer texts repeat often enough to be
+        treated as page furniture rather than content.
 
         Args:
-            doc (fitz.Document): The opened PDF document object.
+            header_candidates (Counter): Occurrence counts of texts seen in the top margin.
+            footer_candidates (Counter): Occurrence counts of texts seen in the bottom margin.
+            page_count (int): Total number of pages in the document.
 
         Returns:
             set: A set of common header and footer text strings to be ignored.
         """
-        header_candidates = defaultdict(int)
-        footer_candidates = defaultdict(int)
-        
-        if not doc.page_count:
-            return set()
-
-        # Define margins based on the first page's height
-        page_height = doc[0].rect.height
-        header_margin = page_height * 0.15  # Top 15%
-        footer_margin = page_height * 0.85  # Bottom 15%
-
-        for page in doc:
-            blocks = page.get_text("dict").get("blocks", [])
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        line_text = " ".join(s["text"].strip() for s in line["spans"] if s["text"].strip()).strip()
-                        if not line_text or len(line_text) < 4:
-                            continue
-                        
-                        # Check vertical position using the line's bounding box
-                        y1 = line["bbox"][1]
-                        if y1 < header_margin:
-                            header_candidates[line_text] += 1
-                        elif y1 > footer_margin:
-                            footer_candidates[line_text] += 1
-        
         common_texts = set()
         # A line is a header/footer if it appears on at least half the pages (or 2, whichever is larger)
-        threshold = max(doc.page_count // 2, 2) if doc.page_count > 2 else 1
+        threshold = max(page_count // 2, 2) if page_count > 2 else 1
 
         for text, count in header_candidates.items():
             if count >= threshold:
@@ -89,7 +278,7 @@ class PDFOutlineExtractor:
 
         if common_texts:
             logger.info(f"Identified potential headers/footers to ignore: {common_texts}")
-            
+
         return common_texts
 
     def extract_text_lines(self, pdf_path):
@@ -97,63 +286,77 @@ class PDFOutlineExtractor:
         Extracts text from a PDF, aggregated by lines, while filtering out
         identified headers and footers.
 
+        The document is parsed once: every page's text dict is walked a single
+        time, collecting both the candidate lines and the header/footer
+        frequency counts. The (cheap, in-memory) filter for repeating
+        headers/footers then runs over the buffered lines, avoiding a second
+        full parse of every page.
+
         Args:
             pdf_path (str): The file path to the PDF.
 
         Returns:
-            list: A list of dictionaries, where each dictionary represents a line of text
-                  with its associated formatting.
+            TextLines: Columnar storage of the extracted lines and their formatting.
         """
         try:
             if not os.path.exists(pdf_path):
                 logger.error(f"PDF file not found: {pdf_path}")
-                return []
+                return TextLines.from_tuples([])
 
             doc = fitz.open(pdf_path)
             if not doc.page_count:
                 logger.warning(f"PDF has no pages: {pdf_path}")
                 doc.close()
-                return []
-
-            # First, identify common headers and footers to ignore them during extraction
-            headers_and_footers = self._identify_headers_and_footers(doc)
-
-            logger.info(f"Processing {doc.page_count} pages from '{pdf_path}'")
-            all_lines = []
-
-            for page_num, page in enumerate(doc):
-                blocks = page.get_text("dict").get("blocks", [])
-                for block in blocks:
-                    if "lines" in block:
-                        for line in block["lines"]:
-                            if not line.get("spans"):
-                                continue
-
-                            line_text = " ".join(span["text"].strip() for span in line["spans"] if span["text"].strip()).strip()
-                            if not line_text:
-                                continue
-                            
-                            # --- FILTERING LOGIC ---
-                            if line_text in headers_and_footers:
-                                continue
-                            if re.search(r'\s\.{3,}\s*\d+$', line_text):
-                                continue
-
-                            first_span = line["spans"][0]
-                            all_lines.append({
-                                'text': line_text,
-                                'font': first_span["font"],
-                                'size': round(first_span["size"], 1),
-                                'flags': first_span["flags"],
-                                'bbox': line["bbox"],
-                                'page': page_num + 1,
-                            })
+                return TextLines.from_tuples([])
+
+            page_count = doc.page_count
+            logger.info(f"Processing {page_count} pages from '{pdf_path}'")
+
+            # Define margins based on the first page's height
+            page_height = doc[0].rect.height
+            header_margin = page_height * 0.15  # Top 15%
+            footer_margin = page_height * 0.85  # Bottom 15%
             doc.close()
+
+            # Split the pages into contiguous chunks, one per worker. Each
+            # worker opens its own document handle, so the pages can be parsed
+            # on all cores in parallel. Small documents use threads to avoid
+            # paying process startup for a handful of pages.
+            worker_count = min(os.cpu_count() or 1, page_count)
+            chunk_size = -(-page_count // worker_count)  # ceil division
+            chunks = [range(start, min(start + chunk_size, page_count))
+                      for start in range(0, page_count, chunk_size)]
+            executor_cls = (ProcessPoolExecutor if page_count >= MIN_PAGES_FOR_PROCESS_POOL
+                            else ThreadPoolExecutor)
+
+            header_candidates = Counter()
+            footer_candidates = Counter()
+            raw_lines = []
+
+            with executor_cls(max_workers=len(chunks)) as executor:
+                results = executor.map(_extract_page_lines, repeat(pdf_path), chunks,
+                                       repeat(header_margin), repeat(footer_margin))
+                # map yields in submission order, so page order is preserved
+                for chunk_lines, chunk_headers, chunk_footers in results:
+                    raw_lines.extend(chunk_lines)
+                    header_candidates.update(chunk_headers)
+                    footer_candidates.update(chunk_footers)
+
+            headers_and_footers = self._compute_common_texts(
+                header_candidates, footer_candidates, page_count)
+
+            # --- FILTERING LOGIC --- (tuple field 0 is the line text)
+            all_lines = [
+                line for line in raw_lines
+                if line[0] not in headers_and_footers
+                and not self._toc_dots_re.search(line[0])
+            ]
+
             logger.info(f"Extracted {len(all_lines)} text lines after filtering.")
-            return all_lines
+            return TextLines.from_tuples(all_lines)
         except Exception as e:
             logger.error(f"Failed to extract text from {pdf_path}: {e}")
-            return []
+            return TextLines.from_tuples([])
 
     def extract_title(self, text_lines):
         """
@@ -161,22 +364,28 @@ class PDFOutlineExtractor:
         largest text on the first page.
 
         Args:
-            text_lines (list): A list of text lines from `extract_text_lines`.
+            text_lines (TextLines): The extracted lines from `extract_text_lines`.
 
         Returns:
             str: The extracted document title or a default title.
         """
-        if not text_lines:
+        if not len(text_lines):
             return "Untitled Document"
 
-        first_page_lines = [line for line in text_lines if line['page'] == 1][:30]
-        if not first_page_lines:
-            first_page_lines = [line for line in text_lines if line['page'] == 2][:30]
-            if not first_page_lines:
-                return "Untitled Document"
-            
-        max_size = max(line['size'] for line in first_page_lines)
-        title_candidates = [line['text'] for line in first_page_lines if line['size'] == max_size]
+        # Lines are stored in page order, so a page's lines form a contiguous
+        # slice; binary-search its boundaries instead of scanning every line.
+        for page_no in (1, 2):
+            start, end = np.searchsorted(text_lines.pages, (page_no, page_no + 1))
+            if end > start:
+                break
+        else:
+            return "Untitled Document"
+        end = min(end, start + 30)
+
+        first_page_sizes = text_lines.sizes[start:end]
+        max_size = first_page_sizes.max()
+        title_candidates = [text_lines.texts[start + i]
+                            for i in np.flatnonzero(first_page_sizes == max_size)]
         
         title = ' '.join(title_candidates).strip()
         title = re.sub(r'\s+', ' ', title)
@@ -191,87 +400,96 @@ class PDFOutlineExtractor:
         font size and a list of potential heading sizes.
 
         Args:
-            text_lines (list): A list of text lines.
+            text_lines (TextLines): The extracted lines.
 
         Returns:
             tuple: A tuple containing (body_size, heading_sizes).
         """
-        if not text_lines:
+        if not len(text_lines):
             return 10.0, []
-            
-        size_frequency = Counter(line['size'] for line in text_lines)
-        body_size = size_frequency.most_common(1)[0][0] if size_frequency else 10.0
-        heading_sizes = sorted([size for size in size_frequency if size > body_size], reverse=True)
-        
+
+        # Count size frequencies in C instead of per-line dict updates.
+        unique_sizes, counts = np.unique(text_lines.sizes, return_counts=True)
+        body_size = float(unique_sizes[counts.argmax()])
+        heading_sizes = sorted(unique_sizes[unique_sizes > body_size].tolist(), reverse=True)
+
         return body_size, heading_sizes
 
-    def is_likely_heading(self, line):
+    def is_likely_heading(self, text, flags, num_depth=0):
         """
         Determines if a line of text is likely a heading based on patterns and content.
 
+        Results are memoized per (text, flags, num_depth) triple, so repeated
+        texts cost a cache lookup instead of the full predicate cascade.
+
         Args:
-            line (dict): A dictionary representing a line of text.
+            text (str): The line's text, already stripped.
+            flags (int): The line's span flags bitmask.
+            num_depth (int): The line's numbered-prefix depth, precomputed at
+                extraction time (0 unless the text starts with a
+                whitespace-delimited number like "2.3.1 Overview").
 
         Returns:
             bool: True if the line is likely a heading, False otherwise.
         """
-        text = line['text']
-        if len(text) < 3 or len(text) > 200:
+        return self._is_heading_cached(text, flags, num_depth)
+
+    def _heading_predicate(self, text, flags, num_depth):
+        """Uncached heading predicate; called through the lru_cache wrapper."""
+        text_len = len(text)
+        if text_len < 3 or text_len > 200:
             return False
-        if re.fullmatch(r'\d+', text):
+        if self._numeric_only_re.fullmatch(text):
             return False
 
-        # Check for explicit heading keywords
-        if text.lower().strip() in self.explicit_headings:
+        # A whitespace-delimited numbered prefix already marks the line as a
+        # heading (it is exactly what the first heading pattern matches); the
+        # depth was parsed once at extraction time, so this skips all regex work.
+        if num_depth:
             return True
 
-        # Check against predefined heading regex patterns
-        for pattern in self.heading_patterns:
-            if re.match(pattern, text):
-                return True
-        
-        # Check for boldness
-        if line['flags'] & 16:
+        # Predicates are ordered cheapest first: most headings are bold, so a
+        # single integer AND usually decides before any string work happens.
+        if flags & 16:
+            return True
+
+        # Check for explicit heading keywords; text arrives already stripped,
+        # so only lines whose length can possibly match pay for the lowercase copy
+        min_len, max_len = self._explicit_len_range
+        if min_len <= text_len <= max_len and text.lower() in self.explicit_headings:
+            return True
+
+        # Check against the combined heading regex patterns
+        if self._combined_heading_re.match(text):
             return True
 
         return False
 
-    def classify_heading_level(self, line, heading_sizes):
+    def classify_heading_level(self, text, font_size, size_to_level, num_depth=0):
         """
         Assigns a heading level (H1, H2, H3) based on font size and text patterns.
 
         Args:
-            line (dict): The heading line to classify.
-            heading_sizes (list): A sorted list of identified heading font sizes.
+            text (str): The heading's text.
+            font_size (float): The heading's font size.
+            size_to_level (dict): Mapping of heading font size to level string.
+            num_depth (int): The heading's precomputed numbered-prefix depth
+                (0 if its text does not start with a whitespace-delimited number).
 
         Returns:
             str: The heading level (e.g., "H1").
         """
-        font_size = line['size']
-        text = line['text']
-        
-        try:
-            level_index = heading_sizes.index(font_size)
-            if level_index == 0:
-                level = "H1"
-            elif level_index == 1:
-                level = "H2"
-            else:
-                level = "H3"
-        except ValueError:
-            level = "H3"
-
-        match = re.match(r'^(\d+(\.\d+)*)', text)
-        if match:
-            num_parts = match.group(1).split('.')
-            if len(num_parts) == 1:
-                level = "H1"
-            elif len(num_parts) == 2:
-                level = "H2"
-            else:
-                level = "H3"
-                
-        return level
+        if not num_depth:
+            # The precomputed depth only covers whitespace-delimited prefixes;
+            # the level override also applies to looser ones like "1. Foo",
+            # so rescan on this rare path (runs once per accepted heading).
+            num_depth, _ = _numbered_prefix_depth(text)
+
+        # A numbered prefix overrides the size-based level
+        if num_depth:
+            return ("H1", "H2", "H3")[min(num_depth - 1, 2)]
+
+        return size_to_level.get(font_size, "H3")
 
     def extract_outline(self, pdf_path):
         """
@@ -283,8 +501,11 @@ class PDFOutlineExtractor:
         Returns:
             dict: A dictionary containing the document's title and a list of headings.
         """
+        # Bound the memoized predicate's memory to this document
+        self._is_heading_cached.cache_clear()
+
         text_lines = self.extract_text_lines(pdf_path)
-        if not text_lines:
+        if not len(text_lines):
             return {"title": "Error: Could Not Process Document", "outline": []}
 
         title = self.extract_title(text_lines)
@@ -292,42 +513,56 @@ class PDFOutlineExtractor:
 
         if not heading_sizes:
             logger.warning("Could not identify any heading styles. Falling back to basic size check.")
-            unique_sizes = sorted(list(set(l['size'] for l in text_lines)), reverse=True)
-            if len(unique_sizes) > 1:
-                body_size = unique_sizes[-1]
-                heading_sizes = [s for s in unique_sizes if s > body_size]
+            unique_sizes = np.unique(text_lines.sizes)
+            if unique_sizes.size > 1:
+                body_size = float(unique_sizes[0])
+                heading_sizes = sorted(unique_sizes[1:].tolist(), reverse=True)
+
+        # Map each heading size to its level once; the largest two sizes get
+        # H1/H2 and everything smaller (or unknown) falls back to H3.
+        size_to_level = {size: ("H1" if i == 0 else "H2" if i == 1 else "H3")
+                         for i, size in enumerate(heading_sizes)}
 
         outline = []
         seen_headings = set()
-        
-        for line in text_lines:
-            if line['size'] <= body_size:
-                continue
-
-            if self.is_likely_heading(line):
-                heading_text = line['text']
-                page_num = line['page']
-                
+
+        # Body lines vastly outnumber headings, so run the numeric filters
+        # (font size plus the predicate's length gate) as one vectorized mask
+        # and only run the per-text heading predicates on the survivors.
+        # Lines are extracted in page order, so the candidates (and therefore
+        # the outline) come out already sorted by page.
+        candidate_indices = np.flatnonzero(
+            (text_lines.sizes > body_size)
+            & (text_lines.lengths >= 3)
+            & (text_lines.lengths <= 200))
+        for i in candidate_indices:
+            heading_text = text_lines.texts[i]
+            num_depth = int(text_lines.num_depths[i])
+
+            if self.is_likely_heading(heading_text, int(text_lines.flags[i]), num_depth):
+                page_num = int(text_lines.pages[i])
+
                 # Filter out the document title if it's mistaken for a heading on the first page
                 if heading_text.strip() == title.strip() and page_num <= 2:
                     logger.info(f"Skipping potential heading as it is the title: '{heading_text}'")
                     continue
 
-                heading_key = (heading_text.lower(), page_num)
+                # Dedup on the original-case text: same heading with different
+                # casing on one page is rare, and keying on the existing string
+                # avoids allocating a lowercase copy per candidate.
+                heading_key = (heading_text, page_num)
                 if heading_key in seen_headings:
                     continue
                 seen_headings.add(heading_key)
-                
-                level = self.classify_heading_level(line, heading_sizes)
-                
+
+                level = self.classify_heading_level(heading_text, float(text_lines.sizes[i]), size_to_level, num_depth)
+
                 outline.append({
                     "level": level,
                     "text": heading_text,
                     "page": page_num
                 })
 
-        outline.sort(key=lambda x: x['page'])
-        
         return {
             "title": title,
             "outline": outline
@@ -375,8 +610,12 @@ if __name__ == "__main__":
     output_file_path = os.path.join(output_dir, output_filename)
 
     try:
-        with open(output_file_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=4, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_file_path, 'wb') as f:
+                f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
         print(f"✅ Outline successfully saved to: {output_file_path}")
     except Exception as e:
         print(f"❌ Failed to save the output file: {e}")